@@ -3,6 +3,35 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
+import base64
+import io
+from pathlib import Path
+
+try:
+    import datashader as ds
+    import datashader.transfer_functions as tf
+except ImportError:
+    ds = None
+
+# Point counts above which scatter plots switch renderer
+WEBGL_THRESHOLD = 2000
+DATASHADER_THRESHOLD = 50000
+
+# Low-cardinality text columns, stored as categoricals for fast filters and groupbys
+CATEGORY_DTYPES = {'sex': 'category', 'smoker': 'category', 'region': 'category'}
+
+# Narrow numeric types halve the bytes scanned by every filter and groupby
+NUMERIC_DTYPES = {'age': 'int16', 'children': 'int8', 'bmi': 'float32', 'charges': 'float32'}
+
+SMOKER_COLORS = {'yes': '#ff4444', 'no': '#44ff44'}
+
+# Regional multipliers used by the premium calculator
+REGIONAL_MULTIPLIERS = {
+    'southeast': 1.15,
+    'northeast': 1.08,
+    'northwest': 1.02,
+    'southwest': 1.00
+}
 
 # Page configuration
 st.set_page_config(
@@ -13,7 +42,7 @@ st.set_page_config(
 )
 
 # Custom CSS for better styling
-st.markdown("""
+CUSTOM_CSS = """
 <style>
     .main-header {
         font-size: 3rem;
@@ -34,14 +63,24 @@ st.markdown("""
         margin: 1rem 0;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+@st.cache_resource
+def _inject_css():
+    """Build the custom CSS block once per server process"""
+    return CUSTOM_CSS
+
+# st.html injects the style block directly, skipping markdown conversion
+st.html(_inject_css())
 
 # Load data function
 @st.cache_data
 def load_data():
     try:
-        # Try different file names in case of variations
+        # Try different file names in case of variations, preferring the
+        # typed Parquet output of the ETL script over re-parsing CSV text
         file_options = [
+            'powerbigroupeddata.parquet',
             'insurance_etl_final.csv',
             'insurance_dashboard_ready.csv',
             'insurancedashboard.csv',
@@ -50,13 +89,28 @@ def load_data():
         ]
         
         for file in file_options:
+            if not Path(file).is_file():
+                continue
+            
             try:
-                df = pd.read_csv(file)
-                st.success(f"✅ Data loaded successfully from {file}")
-                return df
-            except FileNotFoundError:
+                if file.endswith('.parquet'):
+                    # Skip the ETL's band columns; the dashboard derives its own groupings
+                    df = pd.read_parquet(file, columns=['age', 'sex', 'bmi', 'children', 'smoker', 'region', 'charges'])
+                    # The chunked ETL writer keeps categories in first-seen order; sort them so
+                    # category-ordered groupbys match the CSV path
+                    for col in CATEGORY_DTYPES:
+                        df[col] = df[col].cat.reorder_categories(sorted(df[col].cat.categories))
+                else:
+                    df = pd.read_csv(file, dtype=CATEGORY_DTYPES)
+                df = downcast_numeric(df)
+            except Exception as e:
+                # An unreadable file should not hide the remaining candidates
+                st.warning(f"⚠️ Could not read {file}: {e}")
                 continue
-                
+            
+            st.success(f"✅ Data loaded successfully from {file}")
+            return df
+        
         # If no file found, create sample data
         st.warning("⚠️ No data file found. Creating sample data for demonstration.")
         return create_sample_data()
@@ -65,6 +119,18 @@ def load_data():
         st.error(f"Error loading data: {e}")
         return create_sample_data()
 
+def downcast_numeric(df):
+    """Cast the numeric columns present in df to NUMERIC_DTYPES"""
+    dtypes = {}
+    for col, dtype in NUMERIC_DTYPES.items():
+        if col not in df.columns:
+            continue
+        # Integer dtypes cannot hold NaN; leave such columns as they were read
+        if dtype.startswith('int') and df[col].isna().any():
+            continue
+        dtypes[col] = dtype
+    return df.astype(dtypes)
+
 def create_sample_data():
     """Create sample data if no file is found"""
     np.random.seed(42)
@@ -95,10 +161,275 @@ def create_sample_data():
         'charges': charges
     })
     
-    return sample_df
+    return sample_df.astype({**CATEGORY_DTYPES, **NUMERIC_DTYPES})
+
+@st.cache_data
+def apply_filters(df, smoker, region, age_lo, age_hi, bmi_lo, bmi_hi):
+    """Return the rows matching the sidebar filter selections"""
+    # query() evaluates the range predicates in one fused pass (numexpr when installed)
+    filtered_df = df.query('@age_lo <= age <= @age_hi and @bmi_lo <= bmi <= @bmi_hi')
+    
+    if smoker != 'All':
+        filtered_df = filtered_df.query('smoker == @smoker')
+    if region != 'All':
+        filtered_df = filtered_df.query('region == @region')
+    
+    return filtered_df
+
+@st.cache_data
+def compute_aggregates(filtered_df):
+    """Compute the metrics and grouped frames shown for the filtered data"""
+    if len(filtered_df) == 0:
+        return {
+            'smoker_multiplier': 0,
+            'avg_charges': 0,
+            'max_charges': 0
+        }
+    
+    smoker_means = filtered_df.groupby('smoker', observed=True, sort=False)['charges'].mean()
+    
+    smoker_yes_mean = smoker_means.get('yes', 0)
+    smoker_no_mean = smoker_means.get('no', 1)
+    
+    smoker_multiplier = smoker_yes_mean / smoker_no_mean if smoker_no_mean > 0 else 0
+    
+    # Bar-chart groupbys keep sort=True: on categorical keys it is just category order,
+    # and it keeps the bars in region / age order. Series are returned without reset_index().
+    region_avg = filtered_df.groupby('region', observed=True)['charges'].mean()
+    
+    # Create age groups for better visualization
+    # Fixed the age grouping to avoid pandas errors
+    age_group = pd.cut(
+        filtered_df['age'], 
+        bins=[17, 30, 40, 50, 65], 
+        labels=['18-29', '30-39', '40-49', '50+'],
+        include_lowest=True
+    ).rename('age_group')
+    
+    # Group the charges column by the derived Series rather than copying the frame to add it
+    age_group_avg = filtered_df['charges'].groupby(age_group, observed=True).mean()
+    
+    # Summary statistics shared by the metrics and statistical summary sections
+    stats = filtered_df[['age', 'bmi', 'charges']].agg(['mean', 'max', 'median'])
+    
+    # Create correlation matrix for numerical columns
+    numeric_columns = ['age', 'bmi', 'children', 'charges']
+    available_columns = [col for col in numeric_columns if col in filtered_df.columns]
+    
+    corr_matrix = None
+    # A correlation needs at least two columns and two rows
+    if len(available_columns) >= 2 and len(filtered_df) >= 2:
+        values = filtered_df[available_columns].to_numpy(dtype=np.float32)
+        if np.isnan(values).any():
+            # pandas drops missing values pairwise instead of poisoning whole rows/columns
+            corr_matrix = filtered_df[available_columns].astype('float32').corr().to_numpy(dtype=np.float32)
+        else:
+            # Correlate in float32; DataFrame.corr() always works in float64
+            with np.errstate(invalid='ignore', divide='ignore'):
+                corr_matrix = np.corrcoef(values, rowvar=False, dtype=np.float32)
+    
+    return {
+        'smoker_multiplier': smoker_multiplier,
+        'avg_charges': stats.loc['mean', 'charges'],
+        'max_charges': stats.loc['max', 'charges'],
+        'median_charges': stats.loc['median', 'charges'],
+        'avg_age': stats.loc['mean', 'age'],
+        'avg_bmi': stats.loc['mean', 'bmi'],
+        'smoking_rate': filtered_df['smoker'].eq('yes').mean(),
+        'obesity_rate': filtered_df['bmi'].ge(30).mean(),
+        'region_avg': region_avg,
+        'age_group_avg': age_group_avg,
+        'corr_matrix': corr_matrix,
+        'corr_columns': available_columns,
+        'describe': filtered_df[available_columns].describe() if available_columns else None
+    }
+
+@st.cache_resource
+def scatter_skeleton(x, title):
+    """Layout-only WebGL scatter figure with one empty trace per smoker group"""
+    fig = go.Figure([
+        go.Scattergl(mode='markers', name=smoker, marker=dict(color=color))
+        for smoker, color in SMOKER_COLORS.items()
+    ])
+    fig.update_layout(title=title, xaxis_title=x, yaxis_title='charges', legend_title='smoker')
+    return fig
+
+# Figure builders are cached on a hashable summary of their input. Builders that
+# take the filtered frame itself (underscore-prefixed, so Streamlit skips hashing
+# it) are keyed on filter_key, the filter selections plus the filtered row count.
+
+@st.cache_resource(max_entries=64)
+def build_smoking_box(_filtered_df, filter_key):
+    """Box plot of charges by smoking status"""
+    fig = px.box(
+        _filtered_df, 
+        x='smoker', 
+        y='charges',
+        title="💨 Insurance Charges by Smoking Status",
+        color='smoker',
+        color_discrete_map=SMOKER_COLORS
+    )
+    fig.update_layout(
+        showlegend=False,
+        title_font_size=16,
+        title_x=0.5
+    )
+    return fig
+
+@st.cache_resource(max_entries=64)
+def build_scatter(_filtered_df, x, title, filter_key):
+    """Scatter of charges against x, using WebGL or a datashader raster for large data"""
+    n_points = len(_filtered_df)
+    
+    if ds is not None and n_points > DATASHADER_THRESHOLD:
+        # Rasterize server-side and ship a single image instead of every point
+        x_range = (float(_filtered_df[x].min()), float(_filtered_df[x].max()))
+        y_range = (float(_filtered_df['charges'].min()), float(_filtered_df['charges'].max()))
+        width, height = 800, 500
+        canvas = ds.Canvas(plot_width=width, plot_height=height, x_range=x_range, y_range=y_range)
+        agg = canvas.points(_filtered_df, x, 'charges', agg=ds.count_cat('smoker'))
+        img = tf.shade(agg, color_key=SMOKER_COLORS)
+        png = io.BytesIO()
+        img.to_pil().save(png, format='PNG')
+        
+        fig = go.Figure(go.Image(
+            source='data:image/png;base64,' + base64.b64encode(png.getvalue()).decode(),
+            x0=x_range[0],
+            dx=(x_range[1] - x_range[0]) / width,
+            y0=y_range[1],
+            dy=-(y_range[1] - y_range[0]) / height
+        ))
+        # Image traces default to a 1:1 scale anchor, which would squash the raster
+        fig.update_xaxes(constrain='range')
+        fig.update_yaxes(autorange=True, scaleanchor=False, constrain='range')
+        fig.update_layout(title=title, xaxis_title=x, yaxis_title='charges')
+    elif n_points > WEBGL_THRESHOLD:
+        # Copy the cached skeleton and only swap in the data arrays
+        fig = go.Figure(scatter_skeleton(x, title))
+        groups = dict(tuple(_filtered_df.groupby('smoker', observed=True, sort=False)))
+        for trace in fig.data:
+            group = groups.get(trace.name, _filtered_df.iloc[:0])
+            trace.x = group[x].to_numpy()
+            trace.y = group['charges'].to_numpy()
+    else:
+        fig = px.scatter(
+            _filtered_df,
+            x=x,
+            y='charges',
+            color='smoker',
+            title=title,
+            color_discrete_map=SMOKER_COLORS
+        )
+    
+    fig.update_layout(
+        title_font_size=16,
+        title_x=0.5
+    )
+    return fig
+
+def compute_premiums_vectorized(df):
+    """Apply the premium calculator formula to every row of df at once"""
+    # Multiplier per region category code; the trailing 1.0 covers missing regions (code -1)
+    multiplier_lut = np.array(
+        [REGIONAL_MULTIPLIERS.get(region, 1.0) for region in df['region'].cat.categories] + [1.0],
+        dtype=np.float64
+    )
+    
+    base_premium = np.where(df['smoker'].to_numpy() == 'yes', 32050.0, 8434.0)
+    age_adjustment = (df['age'].to_numpy(dtype=np.float64) - 39.2) * 250
+    bmi_adjustment = np.where(df['bmi'].to_numpy() >= 30, 4623.0, 0.0)
+    children_adjustment = df['children'].to_numpy(dtype=np.float64) * 150
+    
+    subtotal = base_premium + age_adjustment + bmi_adjustment + children_adjustment
+    total_premium = subtotal * multiplier_lut[df['region'].cat.codes.to_numpy()]
+    
+    # Minimum premium floor
+    return pd.Series(np.maximum(1000, total_premium), index=df.index, name='premium')
+
+@st.cache_data
+def get_region_options(_df):
+    """Sorted region names for the sidebar filter and calculator"""
+    # _df comes from the argument-less load_data(), so its contents are the same on every
+    # rerun; the underscore stops Streamlit from hashing all of it each time
+    return sorted(_df['region'].cat.categories)
+
+@st.cache_data
+def global_stats(_df):
+    """Whole-dataset figures referenced by the metrics and sidebar on every rerun"""
+    # Unhashed for the same reason as get_region_options: _df holds the load_data() contents
+    return {
+        'records': len(_df),
+        'features': len(_df.columns),
+        'charges_mean': float(_df['charges'].mean()),
+        'regions': _df['region'].nunique()
+    }
+
+@st.cache_resource(max_entries=64)
+def build_charges_histogram(_filtered_df, filter_key):
+    """Histogram of charges, binned server-side"""
+    # Bin server-side so only the 30 bar heights are sent to the browser
+    # Drop missing charges, as px.histogram did; np.histogram cannot bin NaN
+    counts, edges = np.histogram(_filtered_df['charges'].dropna().to_numpy(), bins=30)
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=np.diff(edges),
+        marker_color='#1f77b4'
+    ))
+    fig.update_layout(
+        title="💰 Distribution of Insurance Charges",
+        xaxis_title='charges',
+        yaxis_title='count',
+        bargap=0,
+        title_font_size=16,
+        title_x=0.5
+    )
+    return fig
+
+@st.cache_resource(max_entries=64)
+def build_average_bar(averages, x, title, color_scale):
+    """Bar chart of average charges from a tuple of (group, charges) pairs"""
+    fig = px.bar(
+        pd.DataFrame(list(averages), columns=[x, 'charges']),
+        x=x,
+        y='charges',
+        title=title,
+        color='charges',
+        color_continuous_scale=color_scale
+    )
+    fig.update_layout(
+        title_font_size=16,
+        title_x=0.5,
+        showlegend=False
+    )
+    return fig
+
+@st.cache_resource(max_entries=64)
+def build_correlation_heatmap(_corr_matrix, columns, filter_key):
+    """Heatmap of the correlation matrix"""
+    fig = go.Figure(go.Heatmap(
+        z=_corr_matrix,
+        x=columns,
+        y=columns,
+        colorscale='RdBu_r',
+        zmin=-1,
+        zmax=1,
+        text=np.round(_corr_matrix, 2),
+        texttemplate='%{text}'
+    ))
+    fig.update_layout(
+        title="📊 Correlation Matrix - Healthcare Insurance Features",
+        title_font_size=16,
+        title_x=0.5
+    )
+    # Match px.imshow's orientation, first column in the top row
+    fig.update_yaxes(autorange='reversed')
+    return fig
 
 # Load the data
 df = load_data()
+region_options = get_region_options(df)
+overall = global_stats(df)
 
 # Dashboard title and header
 st.markdown('<h1 class="main-header">🏥 Healthcare Insurance Cost Analysis Dashboard</h1>', unsafe_allow_html=True)
@@ -116,7 +447,7 @@ smoker_filter = st.sidebar.selectbox(
 
 region_filter = st.sidebar.selectbox(
     "🗺️ Region",
-    ['All'] + sorted(df['region'].unique().tolist()),
+    ['All'] + region_options,
     help="Filter by geographic region"
 )
 
@@ -137,30 +468,22 @@ bmi_range = st.sidebar.slider(
 )
 
 # Apply filters
-filtered_df = df.copy()
-filtered_df = filtered_df[
-    (filtered_df['age'] >= age_range[0]) &
-    (filtered_df['age'] <= age_range[1]) &
-    (filtered_df['bmi'] >= bmi_range[0]) &
-    (filtered_df['bmi'] <= bmi_range[1])
-]
-
-if smoker_filter != 'All':
-    filtered_df = filtered_df[filtered_df['smoker'] == smoker_filter]
-if region_filter != 'All':
-    filtered_df = filtered_df[filtered_df['region'] == region_filter]
+filtered_df = apply_filters(
+    df,
+    smoker_filter,
+    region_filter,
+    age_range[0],
+    age_range[1],
+    bmi_range[0],
+    bmi_range[1]
+)
+
+# Hashable summary of the filter state used to key the cached figures
+filter_key = (smoker_filter, region_filter, age_range, bmi_range, len(filtered_df))
 
 # Calculate key metrics
-if len(filtered_df) > 0:
-    smoker_yes_data = filtered_df[filtered_df['smoker'] == 'yes']['charges']
-    smoker_no_data = filtered_df[filtered_df['smoker'] == 'no']['charges']
-    
-    smoker_yes_mean = smoker_yes_data.mean() if len(smoker_yes_data) > 0 else 0
-    smoker_no_mean = smoker_no_data.mean() if len(smoker_no_data) > 0 else 1
-    
-    smoker_multiplier = smoker_yes_mean / smoker_no_mean if smoker_no_mean > 0 else 0
-else:
-    smoker_multiplier = 0
+aggregates = compute_aggregates(filtered_df)
+smoker_multiplier = aggregates['smoker_multiplier']
 
 # Key metrics section
 st.markdown("## 📊 Key Metrics")
@@ -170,15 +493,15 @@ with col1:
     st.metric(
         "📋 Total Records", 
         f"{len(filtered_df):,}",
-        delta=f"{len(filtered_df) - len(df):,} from total"
+        delta=f"{len(filtered_df) - overall['records']:,} from total"
     )
 
 with col2:
-    avg_charges = filtered_df['charges'].mean() if len(filtered_df) > 0 else 0
+    avg_charges = aggregates['avg_charges']
     st.metric(
         "💰 Average Charges", 
         f"${avg_charges:,.0f}",
-        delta=f"${avg_charges - df['charges'].mean():,.0f} vs overall"
+        delta=f"${avg_charges - overall['charges_mean']:,.0f} vs overall"
     )
 
 with col3:
@@ -189,7 +512,7 @@ with col3:
     )
 
 with col4:
-    max_charges = filtered_df['charges'].max() if len(filtered_df) > 0 else 0
+    max_charges = aggregates['max_charges']
     st.metric(
         "📈 Max Charges", 
         f"${max_charges:,.0f}"
@@ -203,72 +526,31 @@ if len(filtered_df) > 0:
     col1, col2 = st.columns(2)
     
     with col1:
-        fig1 = px.box(
-            filtered_df, 
-            x='smoker', 
-            y='charges',
-            title="💨 Insurance Charges by Smoking Status",
-            color='smoker',
-            color_discrete_map={'yes': '#ff4444', 'no': '#44ff44'}
-        )
-        fig1.update_layout(
-            showlegend=False,
-            title_font_size=16,
-            title_x=0.5
-        )
-        st.plotly_chart(fig1, use_container_width=True)
+        fig1 = build_smoking_box(filtered_df, filter_key)
+        st.plotly_chart(fig1, key='smoking_box', use_container_width=True)
     
     with col2:
         # REMOVED trendline="ols" to fix the error
-        fig2 = px.scatter(
-            filtered_df, 
-            x='age', 
-            y='charges',
-            color='smoker', 
-            title="👤 Age vs Insurance Charges",
-            color_discrete_map={'yes': '#ff4444', 'no': '#44ff44'}
-        )
-        fig2.update_layout(
-            title_font_size=16,
-            title_x=0.5
-        )
-        st.plotly_chart(fig2, use_container_width=True)
+        fig2 = build_scatter(filtered_df, 'age', "👤 Age vs Insurance Charges", filter_key)
+        st.plotly_chart(fig2, key='age_scatter', use_container_width=True)
     
     # Row 2: BMI analysis and Regional comparison
     col1, col2 = st.columns(2)
     
     with col1:
         # REMOVED trendline="ols" to fix the error
-        fig3 = px.scatter(
-            filtered_df,
-            x='bmi',
-            y='charges',
-            color='smoker',
-            title="⚖️ BMI vs Insurance Charges",
-            color_discrete_map={'yes': '#ff4444', 'no': '#44ff44'}
-        )
-        fig3.update_layout(
-            title_font_size=16,
-            title_x=0.5
-        )
-        st.plotly_chart(fig3, use_container_width=True)
+        fig3 = build_scatter(filtered_df, 'bmi', "⚖️ BMI vs Insurance Charges", filter_key)
+        st.plotly_chart(fig3, key='bmi_scatter', use_container_width=True)
     
     with col2:
-        region_avg = filtered_df.groupby('region')['charges'].mean().reset_index()
-        fig4 = px.bar(
-            region_avg,
-            x='region',
-            y='charges',
-            title="🗺️ Average Charges by Region",
-            color='charges',
-            color_continuous_scale='viridis'
+        region_avg = aggregates['region_avg']
+        fig4 = build_average_bar(
+            tuple(region_avg.items()),
+            'region',
+            "🗺️ Average Charges by Region",
+            'viridis'
         )
-        fig4.update_layout(
-            title_font_size=16,
-            title_x=0.5,
-            showlegend=False
-        )
-        st.plotly_chart(fig4, use_container_width=True)
+        st.plotly_chart(fig4, key='region_bar', use_container_width=True)
     
     # Distribution analysis
     st.markdown("### 📊 Charge Distribution Analysis")
@@ -276,69 +558,27 @@ if len(filtered_df) > 0:
     col1, col2 = st.columns(2)
     
     with col1:
-        fig5 = px.histogram(
-            filtered_df,
-            x='charges',
-            nbins=30,
-            title="💰 Distribution of Insurance Charges",
-            color_discrete_sequence=['#1f77b4']
-        )
-        fig5.update_layout(
-            title_font_size=16,
-            title_x=0.5
-        )
-        st.plotly_chart(fig5, use_container_width=True)
+        fig5 = build_charges_histogram(filtered_df, filter_key)
+        st.plotly_chart(fig5, key='charges_histogram', use_container_width=True)
     
     with col2:
-        # Create age groups for better visualization
-        filtered_df_copy = filtered_df.copy()
-        # Fixed the age grouping to avoid pandas errors
-        filtered_df_copy['age_group'] = pd.cut(
-            filtered_df_copy['age'], 
-            bins=[17, 30, 40, 50, 65], 
-            labels=['18-29', '30-39', '40-49', '50+'],
-            include_lowest=True
-        )
-        
-        age_group_avg = filtered_df_copy.groupby('age_group', observed=True)['charges'].mean().reset_index()
-        
-        fig6 = px.bar(
-            age_group_avg,
-            x='age_group',
-            y='charges',
-            title="👥 Average Charges by Age Group",
-            color='charges',
-            color_continuous_scale='plasma'
-        )
-        fig6.update_layout(
-            title_font_size=16,
-            title_x=0.5,
-            showlegend=False
+        age_group_avg = aggregates['age_group_avg']
+        fig6 = build_average_bar(
+            tuple(age_group_avg.items()),
+            'age_group',
+            "👥 Average Charges by Age Group",
+            'plasma'
         )
-        st.plotly_chart(fig6, use_container_width=True)
+        st.plotly_chart(fig6, key='age_group_bar', use_container_width=True)
     
     # Additional visualization: Correlation matrix
     st.markdown("### 🔗 Correlation Analysis")
     
-    # Create correlation matrix for numerical columns
-    numeric_columns = ['age', 'bmi', 'children', 'charges']
-    available_columns = [col for col in numeric_columns if col in filtered_df.columns]
+    corr_matrix = aggregates['corr_matrix']
     
-    if len(available_columns) >= 2:
-        corr_matrix = filtered_df[available_columns].corr()
-        
-        fig_corr = px.imshow(
-            corr_matrix,
-            text_auto=True,
-            aspect="auto",
-            title="📊 Correlation Matrix - Healthcare Insurance Features",
-            color_continuous_scale='RdBu_r'
-        )
-        fig_corr.update_layout(
-            title_font_size=16,
-            title_x=0.5
-        )
-        st.plotly_chart(fig_corr, use_container_width=True)
+    if corr_matrix is not None:
+        fig_corr = build_correlation_heatmap(corr_matrix, tuple(aggregates['corr_columns']), filter_key)
+        st.plotly_chart(fig_corr, key='correlation_heatmap', use_container_width=True)
 
 else:
     st.warning("⚠️ No data matches the current filters. Please adjust your selections.")
@@ -375,7 +615,7 @@ with col2:
     )
     calc_region = st.selectbox(
         "🗺️ Region", 
-        sorted(df['region'].unique()),
+        region_options,
         help="Geographic region"
     )
 
@@ -407,17 +647,9 @@ if st.button("💰 Calculate Premium", type="primary"):
     # Children adjustment
     children_adjustment = calc_children * 150
     
-    # Regional multipliers
-    regional_multipliers = {
-        'southeast': 1.15,
-        'northeast': 1.08,
-        'northwest': 1.02,
-        'southwest': 1.00
-    }
-    
     # Calculate total premium
     subtotal = base_premium + age_adjustment + bmi_adjustment + children_adjustment
-    total_premium = subtotal * regional_multipliers.get(calc_region, 1.0)
+    total_premium = subtotal * REGIONAL_MULTIPLIERS.get(calc_region, 1.0)
     total_premium = max(1000, total_premium)  # Minimum premium floor
     
     # Display results
@@ -445,7 +677,7 @@ if st.button("💰 Calculate Premium", type="primary"):
         st.write(f"**Age Adjustment:** ${age_adjustment:,.2f}")
         st.write(f"**BMI Adjustment:** ${bmi_adjustment:,.2f}")
         st.write(f"**Children Adjustment:** ${children_adjustment:,.2f}")
-        st.write(f"**Regional Multiplier:** {regional_multipliers.get(calc_region, 1.0):.2f}")
+        st.write(f"**Regional Multiplier:** {REGIONAL_MULTIPLIERS.get(calc_region, 1.0):.2f}")
         st.write(f"**Total Premium:** ${total_premium:,.2f}")
 
 st.markdown('</div>', unsafe_allow_html=True)
@@ -489,20 +721,19 @@ if len(filtered_df) > 0:
     
     with col1:
         st.markdown("### 📊 Descriptive Statistics")
-        available_numeric = [col for col in ['age', 'bmi', 'children', 'charges'] if col in filtered_df.columns]
-        if available_numeric:
-            st.dataframe(filtered_df[available_numeric].describe())
+        if aggregates['describe'] is not None:
+            st.dataframe(aggregates['describe'])
     
     with col2:
         st.markdown("### 🔢 Key Statistics")
-        smoking_yes_pct = (filtered_df['smoker'] == 'yes').mean() * 100
-        obesity_pct = (filtered_df['bmi'] >= 30).mean() * 100
+        smoking_yes_pct = aggregates['smoking_rate'] * 100
+        obesity_pct = aggregates['obesity_rate'] * 100
         
         st.write(f"**Smoking Rate:** {smoking_yes_pct:.1f}%")
         st.write(f"**Obesity Rate:** {obesity_pct:.1f}%")
-        st.write(f"**Average Age:** {filtered_df['age'].mean():.1f} years")
-        st.write(f"**Average BMI:** {filtered_df['bmi'].mean():.1f}")
-        st.write(f"**Median Charges:** ${filtered_df['charges'].median():,.0f}")
+        st.write(f"**Average Age:** {aggregates['avg_age']:.1f} years")
+        st.write(f"**Average BMI:** {aggregates['avg_bmi']:.1f}")
+        st.write(f"**Median Charges:** ${aggregates['median_charges']:,.0f}")
 
 # Footer
 st.markdown("---")
@@ -513,10 +744,10 @@ st.markdown("*Data Analytics with AI Hackathon | Powered by Streamlit & Plotly*"
 st.sidebar.markdown("---")
 st.sidebar.markdown("### 📊 Dataset Info")
 st.sidebar.info(f"""
-**Records:** {len(df):,}  
-**Features:** {len(df.columns)}  
+**Records:** {overall['records']:,}  
+**Features:** {overall['features']}  
 **Date Range:** All ages 18-64  
-**Regions:** {len(df['region'].unique())}
+**Regions:** {overall['regions']}
 """)
 
 st.sidebar.markdown("### 🎯 Key Findings")
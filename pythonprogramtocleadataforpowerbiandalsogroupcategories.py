@@ -1,79 +1,122 @@
+import os
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from concurrent.futures import ThreadPoolExecutor
 
-# Load data
-df = pd.read_csv('Star_cleaned_insurance.csv')
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
-# Round charges to 2 decimal places
-df['charges'] = df['charges'].round(2)
+# Explicit column types skip dtype inference while parsing
+dtypes = {
+    'age': 'int16',
+    'sex': 'category',
+    'bmi': 'float32',
+    'children': 'int8',
+    'smoker': 'category',
+    'region': 'category',
+    'charges': 'float64'  # float32 would lose cents on the larger charges
+}
 
-# Charges bands (interpretable brackets)
-def charges_band(val):
-    if val < 5000:
-        return "<5,000"
-    elif val < 10000:
-        return "5,000–9,999"
-    elif val < 20000:
-        return "10,000–19,999"
-    elif val < 30000:
-        return "20,000–29,999"
-    elif val < 50000:
-        return "30,000–49,999"
-    else:
-        return "50,000+"
+# Rows per chunk; the input is streamed so peak memory stays O(chunk), not O(file)
+CHUNK_SIZE = 500_000
 
-df['charges_band'] = df['charges'].apply(charges_band)
+# The bands are plain sorted-bin lookups, which np.searchsorted already handles.
+# Set this to use the compiled ladder below instead, e.g. as the starting point for
+# banding logic that is not a monotonic bin lookup (requires numba).
+USE_NUMBA_BANDING = False
 
-# BMI category (numeric bands)
-def bmi_category(val):
-    if val < 18.5:
-        return "<18.5"
-    elif val < 25:
-        return "18.5–24.9"
-    elif val < 30:
-        return "25–29.9"
-    elif val < 35:
-        return "30–34.9"
+# Compiled "val < bound" ladder. nogil lets the thread pool below run the columns
+# concurrently; parallel=True is not used since numba's default threading layer
+# rejects concurrent calls from several threads.
+if njit is not None:
+    @njit(nogil=True, cache=True)
+    def bin_codes(values, bins, out):
+        for i in range(values.shape[0]):
+            v = values[i]
+            code = 0
+            if v != v:
+                # NaN falls through every comparison into the last band
+                code = bins.shape[0]
+            while code < bins.shape[0] and v >= bins[code]:
+                code += 1
+            out[i] = code
+
+# Map each value to the label of its bin; bins are the sorted upper bounds ("val < bound")
+def searchsorted_bin(values, bins, labels):
+    if USE_NUMBA_BANDING and njit is not None:
+        codes = np.empty(values.shape[0], dtype=np.int8)
+        bin_codes(values, bins, codes)
     else:
-        return "35+"
+        codes = np.searchsorted(bins, values, side='right')
+    return labels[codes]
 
-df['bmi_category'] = df['bmi'].apply(bmi_category)
+# Charges bands (interpretable brackets)
+charges_bins = np.array([5000, 10000, 20000, 30000, 50000], dtype=np.float64)
+charges_labels = np.array(["<5,000", "5,000–9,999", "10,000–19,999", "20,000–29,999", "30,000–49,999", "50,000+"])
 
-# Age group (numeric)
-def age_group(val):
-    if val < 26:
-        return "18–25"
-    elif val < 36:
-        return "26–35"
-    elif val < 46:
-        return "36–45"
-    elif val < 56:
-        return "46–55"
-    elif val < 66:
-        return "56–65"
-    else:
-        return "66+"
+# BMI category (numeric bands)
+bmi_bins = np.array([18.5, 25, 30, 35], dtype=np.float64)
+bmi_labels = np.array(["<18.5", "18.5–24.9", "25–29.9", "30–34.9", "35+"])
 
-df['age_group'] = df['age'].apply(age_group)
+# Age group (numeric)
+age_bins = np.array([26, 36, 46, 56, 66], dtype=np.float64)
+age_labels = np.array(["18–25", "26–35", "36–45", "46–55", "56–65", "66+"])
 
 # Age group (label)
-def age_group_label(val):
-    if val < 26:
-        return "Young Adult"
-    elif val < 36:
-        return "Adult"
-    elif val < 46:
-        return "Middle Age"
-    elif val < 56:
-        return "Senior"
-    elif val < 66:
-        return "Elder"
-    else:
-        return "Super Senior"
+age_group_labels = np.array(["Young Adult", "Adult", "Middle Age", "Senior", "Elder", "Super Senior"])
+
+def add_bands(df, ex):
+    # Round charges to 2 decimal places
+    df['charges'] = df['charges'].round(2)
+
+    # The four band columns are independent and numpy releases the GIL in searchsorted,
+    # so bin them on separate threads
+    charges_band = ex.submit(searchsorted_bin, df['charges'].to_numpy(), charges_bins, charges_labels)
+    bmi_category = ex.submit(searchsorted_bin, df['bmi'].to_numpy(), bmi_bins, bmi_labels)
+    age_group = ex.submit(searchsorted_bin, df['age'].to_numpy(), age_bins, age_labels)
+    age_group_label = ex.submit(searchsorted_bin, df['age'].to_numpy(), age_bins, age_group_labels)
+
+    df['charges_band'] = charges_band.result()
+    df['bmi_category'] = bmi_category.result()
+    df['age_group'] = age_group.result()
+    df['age_group_label'] = age_group_label.result()
+
+# Load data chunk by chunk, appending each banded chunk to the CSV and Parquet outputs.
+# Both outputs are written under temporary names and only renamed into place once every
+# chunk succeeded, so a failed run never leaves a truncated file for Power BI or the dashboard.
+csv_tmp = 'powerbigroupeddata.csv.tmp'
+parquet_tmp = 'powerbigroupeddata.parquet.tmp'
+parquet_writer = None
+try:
+    try:
+        with ThreadPoolExecutor(4) as ex:
+            chunks = pd.read_csv('Star_cleaned_insurance.csv', dtype=dtypes, usecols=list(dtypes), chunksize=CHUNK_SIZE)
+            for i, df in enumerate(chunks):
+                add_bands(df, ex)
+
+                # Save to CSV (Power BI reads this file)
+                df.to_csv(csv_tmp, mode='w' if i == 0 else 'a', header=i == 0, index=False)
 
-df['age_group_label'] = df['age'].apply(age_group_label)
+                # Save a typed, compressed copy for faster downstream loads
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                if parquet_writer is None:
+                    parquet_writer = pq.ParquetWriter(parquet_tmp, table.schema, compression='snappy')
+                parquet_writer.write_table(table)
+    finally:
+        if parquet_writer is not None:
+            parquet_writer.close()
+except BaseException:
+    # Leave any previous outputs untouched and drop the partial ones
+    for tmp in (csv_tmp, parquet_tmp):
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    raise
 
-# Save to CSV
-df.to_csv('powerbigroupeddata.csv', index=False)
+os.replace(csv_tmp, 'powerbigroupeddata.csv')
+os.replace(parquet_tmp, 'powerbigroupeddata.parquet')
 
-print("Enhanced data saved as 'powerbigroupeddata.csv'")
+print("Enhanced data saved as 'powerbigroupeddata.csv' and 'powerbigroupeddata.parquet'")